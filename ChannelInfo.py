@@ -1,6 +1,8 @@
 class ChannelInfo:
     """A data structure to hold channel information."""
 
+    __slots__ = ("channel", "soundfont_id", "bank", "preset", "name")
+
     def __init__(self, channel, soundfont_id, bank, preset, name):
         """Initialize ChannelInfo.
 
@@ -6,9 +6,15 @@ from SoundEngine import SoundEngine
 import fluidsynth
 
 import logging
-import threading
+
+from bisect import bisect_left
+from ctypes import c_void_p
 
 PBQ = 1000
+LATENCY = 200  # Look-ahead window of scheduled notes in milliseconds
+
+# Returns the data of a timer event, which pyfluidsynth doesn't wrap
+fluid_event_get_data = fluidsynth.cfunc('fluid_event_get_data', c_void_p, ('evt', c_void_p, 1))
 
 class FluidSynthSoundEngine(SoundEngine):
     """Concrete implementation of SoundEngine using FluidSynth."""
@@ -20,90 +26,151 @@ class FluidSynthSoundEngine(SoundEngine):
         self._synth_id = self._seq.register_fluidsynth(self._synth)
         self._step_callback_id = self._seq.register_client("stepCallback", self._step_callback)
 
-        self._channels = []
+        # Note event allocated once and reused for every scheduled step note, the sequencer
+        # copies the event into its queue when it is sent
+        self._note_event = fluidsynth.new_fluid_event()
+        fluidsynth.fluid_event_set_source(self._note_event, -1)
+        fluidsynth.fluid_event_set_dest(self._note_event, self._synth_id)
+
+        self._channel_map = {}  # Channels by id, for constant time removal (keeps the insertion order)
+        self._channels = ()  # Replaced as a whole on changes, so the scheduler never needs a lock
+        self._channel_info_cache = {}  # Caches channel information (channel -> ChannelInfo)
         
         self._steps = 32
 
         self._bpm = bpm
         self._beats_per_measure = beats_per_measure
-        self._seconds_per_beat = 60 / bpm
-        self._is_playing = False
-        self._lock = threading.Lock()  # For synchronizing the tick steps
+        self._us_per_step = round(60_000_000 / bpm)  # Exact step length in microseconds (one beat)
+        # Start time offsets of all steps (and the end of the last step) within the sequence
+        self._step_ticks = tuple(self._us_per_step * i // 1000 for i in range(self._steps + 1))
+        self._step_durations = tuple(end - start for start, end in zip(self._step_ticks, self._step_ticks[1:]))
+        self._us_per_sequence = self._us_per_step * self._steps  # Exact sequence length in microseconds
+        self._driver_started = False
+        # Generation and start tick of the running sequence, None when stopped. Published by start() and
+        # stop() with a single store, everything else of the sequence is only written by the step callback.
+        self._play_state = None
+        self._generations = 0  # Number of starts, each start is a new generation of step timers
+        self._generation = 0  # Generation the step callback currently schedules
 
     def _step_callback(self, time, event, seq, data):
-        # Increment current step
-        self._cur_step = (self._cur_step + 1) % self._steps
-
-        # Set new start_time if there was a step overrun
-        if self._cur_step == 0:
-            self._start_time = self._start_time + int(self._seconds_per_beat * 1000 * self._steps)
-            # Calculate new note times
-            self.update()
-
-        # Set new beat callback
-        self._seq.timer(self._start_time + int(self._seconds_per_beat * 1000 * (self._cur_step + 1)), dest=self._step_callback_id)
-
-        logging.debug(f"Beat {self._cur_step} triggered: time={time}")
+        generation = fluid_event_get_data(event)
+        play_state = self._play_state
+        if play_state is None or play_state[0] != generation:
+            return  # Stopped, or a timer of an earlier start whose chain ends here
+
+        if generation != self._generation:
+            # First timer of a new start, begin the sequence at its start tick
+            self._generation = generation
+            self._cur_step = 0
+            self._carry_us = 0
+            self._start_time = play_state[1]
+
+        # Keep the look-ahead window filled with notes
+        self._schedule_until(time + LATENCY)
+
+        # Set new callback for the next step to be scheduled
+        self._schedule_next_callback()
+
+        logging.debug("Scheduled until step %d: time=%d", self._cur_step, time)
+
+    def _schedule_next_callback(self):
+        """Sets the next callback to when the next unscheduled step is half a look-ahead window ahead"""
+        next_step_tick = self._start_time + self._step_ticks[self._cur_step]
+        self._seq.timer(next_step_tick - LATENCY // 2, data=self._generation, dest=self._step_callback_id)
+
+    def _schedule_until(self, target_tick):
+        """Schedules all steps starting before the target tick"""
+        step_ticks = self._step_ticks
+        steps = self._steps
+        cur_step = self._cur_step
+        start_time = self._start_time
+        while start_time + step_ticks[cur_step] < target_tick:
+            # Schedule all steps of the current sequence starting before the target tick at once
+            next_step = bisect_left(step_ticks, target_tick - start_time, cur_step, steps)
+            self._schedule_steps(cur_step, next_step)
+            cur_step = next_step
+
+            # Set new start_time if there was a step overrun, carrying the sub-millisecond
+            # rest of the sequence length so the sequence never drifts
+            if cur_step == steps:
+                cur_step = 0
+                carry_us = self._carry_us + self._us_per_sequence
+                start_time += carry_us // 1000
+                self._carry_us = carry_us % 1000
+                self._start_time = start_time
+            self._cur_step = cur_step
 
     def get_steps(self):
         return self._steps
 
     def add_channel(self, channel):
-        """Adds a channel to the step sequencer."""
-        self._channels.append(channel)
+        """Adds a channel to the step sequencer, its step count must match the steps of the sequence."""
+        if channel.get_step_count() != self._steps:
+            raise ValueError(f"Channel has {channel.get_step_count()} steps, the step sequencer has {self._steps}")
+        self._channel_map[id(channel)] = channel
+        self._channels = tuple(self._channel_map.values())
 
     def remove_channel(self, channel):
         """Removes a channel from the step sequencer."""
-        self._channels.remove(channel)
+        if self._channel_map.pop(id(channel), None) is not None:
+            self._channels = tuple(self._channel_map.values())
 
     def get_channels(self):
         """Returns all step sequencer channels"""
         return self._channels
 
-    def update(self):
-        """Loads the notes of the step channels into the sequence"""
+    def _schedule_steps(self, first_step, end_step):
+        """Schedules the notes of the steps from first_step up to (excluding) end_step of all step channels"""
+        start_time = self._start_time
+        step_ticks = self._step_ticks
+        step_durations = self._step_durations
+        note_event = self._note_event
+        set_note = fluidsynth.fluid_event_note
+        send_at = fluidsynth.fluid_sequencer_send_at
+        sequencer = self._seq.sequencer
+
+        # Collect the notes of all channels first, so they are sent to the sequencer in time order
+        step_notes = []
         for channel in self._channels:
-            channel_steps = channel.get_steps()
-            i = 0
-            for step in channel_steps:
-                if step:
-                    start_tick = self._start_time + int(self._seconds_per_beat * 1000 * i)  # Calculates the start time of the step
-                    note = step[0]                              # MIDI note value
-                    velocity = step[1]                          # Note velocity
-
-                    if note and velocity:
-                        # Set Note-On event
-                        self._seq.note_on(
-                            start_tick,            # Time of the Note-On event
-                            0,                     # MIDI channel (here channel 0, can be adjusted)
-                            note,                  # MIDI note value
-                            velocity,              # Note velocity
-                            dest=self._synth_id    # Target Synthesizer ID
-                        )
-
-                        # Set Note-Off event (one beat later)
-                        stop_tick = self._start_time + int(self._seconds_per_beat * 1000 * (i + 1))  # Calculates the stop time of the step
-                        self._seq.note_off(
-                            stop_tick,             # Time of the Note-Off event
-                            0,                     # MIDI channel
-                            note,                  # MIDI note value
-                            80,                    # Velocity when releasing the note
-                            dest=self._synth_id    # Target Synthesizer ID
-                        )
-                        logging.debug(f"  note_on({start_tick}, 0, {note}, 100), note_off({stop_tick} , 0, 80, 100)")
-                i = i + 1
+            # Read the published snapshot once, so a concurrent step change can't be seen half-written
+            notes, velocities, mask = channel.get_snapshot()
+            # Only visit the steps with notes within the range, lowest step first
+            mask &= (1 << end_step) - (1 << first_step)
+            while mask:
+                step = (mask & -mask).bit_length() - 1
+                mask &= mask - 1
+                velocity = velocities[step]  # Note velocity
+                if velocity:
+                    step_notes.append((step, notes[step], velocity))
+        step_notes.sort()
+
+        debug = logging.getLogger().isEnabledFor(logging.DEBUG)
+        for step, note, velocity in step_notes:
+            start_tick = start_time + step_ticks[step]  # Calculates the start time of the step
+
+            # Set Note event on MIDI channel 0 (can be adjusted), the sequencer stops it one beat later
+            set_note(note_event, 0, note, velocity, step_durations[step])
+            send_at(sequencer, note_event, start_tick, 1)
+            if debug:
+                logging.debug("  note(%d, 0, %d, %d, %d)", start_tick, note, velocity, step_durations[step])
 
     def stop(self):
-        self._is_playing = False
+        """Stops scheduling new steps, notes within the look-ahead window still play out."""
+        self._play_state = None
 
     def start(self):
-        """Start the FluidSynth engine with the configured driver."""
-        self._synth.start(driver=DRIVER)
-        self._is_playing = True
-        self._start_time = self._seq.get_tick()
-        self._cur_step = 0
-        self.update()
-        self._seq.timer(self._seq.get_tick() + int(self._seconds_per_beat * 1000), dest=self._step_callback_id)
+        """Start the FluidSynth engine with the configured driver and the step sequence, if not already running."""
+        if self._play_state is not None:
+            return
+        if not self._driver_started:
+            self._synth.start(driver=DRIVER)
+            self._driver_started = True
+        # A new generation, so a timer still pending from before the last stop ends its chain.
+        # The first timer fires right away and fills the look-ahead window on the sequencer thread.
+        self._generations += 1
+        start_tick = self._seq.get_tick()
+        self._play_state = (self._generations, start_tick)
+        self._seq.timer(start_tick, data=self._generations, dest=self._step_callback_id)
 
     def get_synth(self):
         return self._synth
@@ -129,6 +196,7 @@ class FluidSynthSoundEngine(SoundEngine):
             preset (int): The preset number in the soundfont.
         """
         self._synth.program_select(channel, sfid, bank, preset)
+        self._channel_info_cache.pop(channel, None)
 
     def channel_info(self, channel):
         """Retrieve information about a specific channel in FluidSynth.
@@ -139,13 +207,30 @@ class FluidSynthSoundEngine(SoundEngine):
         Returns:
             ChannelInfo: Information about the channel, encapsulated in a ChannelInfo structure.
         """
-        info = self._synth.channel_info(channel)
-        return ChannelInfo(channel=channel,
-                           soundfont_id=info[0],
-                           bank=info[1],
-                           preset=info[2],
-                           name=info[3])
+        channel_info = self._channel_info_cache.get(channel)
+        if channel_info is None:
+            info = self._synth.channel_info(channel)
+            channel_info = ChannelInfo(channel=channel,
+                                       soundfont_id=info[0],
+                                       bank=info[1],
+                                       preset=info[2],
+                                       name=info[3])
+            self._channel_info_cache[channel] = channel_info
+        return channel_info
         
+    def get_tick(self):
+        return self._seq.get_tick()
+
+    def schedule_note(self, time, channel, note, velocity, duration):
+        self._seq.note(time, channel, note, velocity, duration, dest=self._synth_id)
+
+    def register_callback(self, name, callback):
+        return self._seq.register_client(
+            name, lambda time, event, seq, data: callback(time, fluid_event_get_data(event) or 0))
+
+    def schedule_callback(self, time, callback_id, data=0):
+        self._seq.timer(time, data=data, dest=callback_id)
+
     def synch_noteon(self, channel, note, velocity=80):
         self._synth.noteon(channel, note, velocity)
         
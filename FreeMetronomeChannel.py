@@ -1,31 +1,62 @@
 from InstrumentChannel import InstrumentChannel
 
-import time
+LOOKAHEAD = 100  # Milliseconds the note of a beat is scheduled ahead of the beat
 
 class FreeMetronomeChannel(InstrumentChannel):
-    """A channel for the metronome, which plays only one note on each tick, with accent logic."""
+    """A channel for the metronome, which plays only one note on each beat, with accent logic."""
 
     def __init__(self, project, instrument_name, volume=100, accent_volume=127):
         super().__init__(project, instrument_name, volume)
         self._accent_volume = accent_volume  # Volume of the accent on the first beat
+        self._update_velocities()
         self._tick_count = 0  # Counter for the beat count
+        self._generation = 0  # Incremented on every play, timers of older plays are ignored
+        self._beat_callback_id = self._synth.register_callback("metronomeCallback", self._beat_callback)
 
-    def tick(self):
-        """Responds to the tick and plays a note with accent logic."""
+    def set_volume(self, volume):
+        """Sets the channel's volume."""
+        super().set_volume(volume)
+        self._update_velocities()
+
+    def _update_velocities(self):
+        # Note velocities of the accented first beat and of the other beats
+        self._beat_velocities = (int(self._accent_volume * self._volume / 100), self._volume)
+
+    def play(self):
+        """Starts the channel and the periodic metronome timer of the sequencer."""
         if self._is_playing:
-            # Determine if this is the first beat of a measure
-            self._tick_count = (self._tick_count % self._parent.get_beats_per_measure()) + 1
-
-            if self._tick_count == 1:
-                # Accent on the first beat of the measure (louder)
-                note = 60  # Example note for the beat (can be changed)
-                velocity = int(self._accent_volume * self._volume / 100)  # Volume of the accent
-            else:
-                # Normal volume for other beats
-                note = 60  # Example note for the beat
-                velocity = self.get_volume()  # Normal volume
-
-            # Play the note for the duration of seconds_per_beat
-            self._synth.synch_noteon(self._channel, note, velocity)
-            time.sleep(self._parent.get_seconds_per_beat())  # The duration of the note matches the length of a beat
-            self._synth.synch_noteoff(self._channel, note)
\ No newline at end of file
+            return
+        # Reset the beat state before the channel plays, so a stale timer never sees it half-reset
+        self._generation += 1
+        self._tick_count = 0
+        self._beat_count = 0
+        self._start_tick = self._synth.get_tick()
+        self._bpm = self._parent.get_bpm()
+        self._beats_per_measure = self._parent.get_beats_per_measure()
+        # The note is released half a beat later, so the note-off can never cut the next beat
+        self._note_duration = self._parent.get_ms_per_beat() // 2
+        super().play()  # Set the channel to "play"
+        self._schedule_beat()
+
+    def _beat_callback(self, time, generation):
+        """Schedules the upcoming beat once its timer expired, timers of an earlier play end their chain."""
+        if self._is_playing and generation == self._generation:
+            self._schedule_beat()
+
+    def _schedule_beat(self):
+        """Schedules the note of the upcoming beat with accent logic and arms the timer for the beat after it."""
+        # Determine if this is the first beat of a measure
+        self._tick_count = (self._tick_count % self._beats_per_measure) + 1
+
+        note = 60  # Example note for the beat (can be changed)
+        # Accent on the first beat of the measure (louder), normal volume for other beats
+        velocity = self._beat_velocities[self._tick_count != 1]
+
+        # Beat times are derived from the beat count, so they never drift
+        beat_tick = self._start_tick + 60_000 * self._beat_count // self._bpm
+        self._synth.schedule_note(beat_tick, self._channel, note, velocity, self._note_duration)
+        self._beat_count += 1
+
+        # The following beat is scheduled shortly before it is due, so a stop never leaves a whole beat queued
+        next_beat_tick = self._start_tick + 60_000 * self._beat_count // self._bpm
+        self._synth.schedule_callback(next_beat_tick - LOOKAHEAD, self._beat_callback_id, self._generation)
@@ -1,9 +1,9 @@
 from InstrumentChannel import InstrumentChannel
+from MidiEventRing import MidiEventRing
 
-import mido
+import rtmidi
 
 import logging
-import threading
 
 class FreeMidiChannel(InstrumentChannel):
     """A channel for MIDI input and output with FluidSynth and polyphony."""
@@ -11,41 +11,82 @@ class FreeMidiChannel(InstrumentChannel):
     def __init__(self, project, port_name, instrument_name, volume=80):
         super().__init__(project, instrument_name, volume)
         self._port_name = port_name
-        self._active_notes = set()
+        self._active_notes = 0  # Bitmap of the active MIDI notes (bit n set = note n on)
+        self._port = None
+        self._midi_events = MidiEventRing()  # Played notes for consumers outside the MIDI thread
+        self._message_handlers = {0x90: self._note_on, 0x80: self._note_off}  # By status without channel
+        self._last_note = None  # Display text of the last played note
 
     def play(self):
         """Starts the channel and begins receiving MIDI data."""
         super().play()  # Set the channel to "play"
-        if self._is_playing:
+        if self._is_playing and self._port is None:
             logging.debug(f"Begin receiving MIDI data on channel {self._instrument_name}...")
-            threading.Thread(target=self._read_midi_input, daemon=True).start()
+            # RtMidi calls back from its own native thread with the raw bytes of every message,
+            # system exclusive, timing and active sensing messages are ignored by default
+            port = rtmidi.MidiIn()
+            ports = port.get_ports()
+            if self._port_name not in ports:
+                # The device may have been unplugged, the other channels keep playing
+                logging.error("MIDI input port %r not found, available ports: %s", self._port_name, ports)
+                return
+            port.open_port(ports.index(self._port_name))
+            port.set_callback(self._play_midi_message)
+            self._port = port
 
     def stop(self):
         """Stops the channel and ends all active notes."""
         super().stop()  # Set the channel to "stop"
         if not self._is_playing:
             logging.debug(f"Stopping MIDI data listening on channel {self._instrument_name}...")
-            for note in self._active_notes:
-                self._synth.noteoff(self._channel, note)
-            self._active_notes.clear()
-
-    def _play_midi_message(self, message):
-        """Plays a MIDI message and manages active notes."""
-        if message.type == "note_on" and message.velocity > 0:
-            if message.note not in self._active_notes:
-                logging.debug(f"Note on: {message.note}, Velocity: {message.velocity}")
-                self._synth.synch_noteon(self._channel, message.note, message.velocity)
-                self._active_notes.add(message.note)
-        elif message.type in ["note_off", "note_on"] and message.velocity == 0:
-            if message.note in self._active_notes:
-                logging.debug(f"Note off: {message.note}")
-                self._synth.synch_noteoff(self._channel, message.note)
-                self._active_notes.remove(message.note)
-
-    def _read_midi_input(self):
-        """Reads MIDI inputs from a specific MIDI port and plays them."""
-        with mido.open_input(self._port_name) as port:
-            logging.debug(f"Listening for MIDI input on {self._port_name}...")
-            for message in port:
-                if self._is_playing:
-                    self._play_midi_message(message)
\ No newline at end of file
+            if self._port is not None:
+                self._port.close_port()
+                self._port = None
+            active_notes = self._active_notes
+            while active_notes:
+                lowest = active_notes & -active_notes
+                self._noteoff(lowest.bit_length() - 1)
+                active_notes ^= lowest
+            self._active_notes = 0
+
+    def drain_midi_events(self):
+        """Yields the notes played since the last call as (status, note, velocity) tuples.
+
+        Must only be called from a single consumer thread.
+        """
+        return self._midi_events.drain()
+
+    def render(self, label, rows):
+        """Appends the label row with the last played MIDI note to rows."""
+        for status, note, velocity in self.drain_midi_events():
+            self._last_note = f"Note {'on' if status == 0x90 else 'off'}: {note}"
+        rows.append(label if self._last_note is None else f"{label:<40}{self._last_note}")
+
+    def _play_midi_message(self, event, data=None):
+        """Plays a raw MIDI message (message bytes, delta time) and manages active notes."""
+        message = event[0]
+        handler = self._message_handlers.get(message[0] & 0xF0)
+        if handler:
+            handler(message)
+
+    def _note_on(self, message):
+        """Plays a note on message, a velocity of 0 stops the note."""
+        note, velocity = message[1], message[2]
+        bit = 1 << note
+        if velocity == 0:
+            self._note_off(message)
+        elif not self._active_notes & bit:  # Repeated note ons of an active note are dropped
+            logging.debug("Note on: %d, Velocity: %d", note, velocity)
+            self._noteon(note, velocity)
+            self._active_notes |= bit
+            self._midi_events.push(0x90, note, velocity)
+
+    def _note_off(self, message):
+        """Stops the note of a note off message."""
+        note = message[1]
+        bit = 1 << note
+        if self._active_notes & bit:
+            logging.debug("Note off: %d", note)
+            self._noteoff(note)
+            self._active_notes &= ~bit
+            self._midi_events.push(0x80, note, 0)
@@ -1,5 +1,7 @@
 import logging
 
+from functools import partial
+
 class InstrumentChannel:
     """Abstract base class for all instrument channels."""
 
@@ -14,6 +16,9 @@ class InstrumentChannel:
         """Sets the channel's instrument based on the instrument name."""
         self._instrument_name = instrument_name
         self._synth, self._channel = self._instrument_registry.get_instrument(instrument_name)
+        # Bind the note calls to the channel once, they are used for every played note
+        self._noteon = partial(self._synth.synch_noteon, self._channel) if self._synth else None
+        self._noteoff = partial(self._synth.synch_noteoff, self._channel) if self._synth else None
 
     def set_volume(self, volume):
         """Sets the channel's volume."""
@@ -41,4 +46,8 @@ class InstrumentChannel:
 
     def tick(self):
         """Reaction on tick step"""
-        pass
\ No newline at end of file
+        pass
+
+    def render(self, label, rows):
+        """Appends the display rows of the channel, starting with the label row, to rows."""
+        rows.append(label)
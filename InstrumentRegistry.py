@@ -1,5 +1,8 @@
 import sys
 import logging
+import threading
+
+from collections import deque
 
 from SoundEngine import SoundEngine
 
@@ -13,6 +16,8 @@ elif sys.platform == "win32":
 else:
     DRIVER = "file"  # Fallback driver
 
+MAX_CHANNELS = 16  # Number of MIDI channels of the sound engine
+
 class InstrumentRegistry:
     """Manages instrument IDs and maps them to the SoundEngine."""
 
@@ -24,6 +29,9 @@ class InstrumentRegistry:
         """
         self._registry = {}  # Stores information about instruments and their channels
         self._soundfont_cache = {}  # Caches loaded soundfonts (path -> sfid)
+        self._free_channels = deque(range(MAX_CHANNELS))  # Pool of unassigned channels
+        self._program_channels = {}  # Channels of the selected programs ((sfid, bank, preset) -> channel)
+        self._lock = threading.Lock()  # For synchronizing the channel pool
         self._sound_engine = sound_engine
 
     def register_instrument(self, instrument_name, soundfont_path, bank=0, preset=0):
@@ -43,23 +51,58 @@ class InstrumentRegistry:
             sfid = self._sound_engine.load_soundfont(soundfont_path)
             self._soundfont_cache[soundfont_path] = sfid
 
-        # Select the program on a new channel
-        available_channel = len(self._registry) % 16  # Simple round-robin approach
-
-        self._sound_engine.select_instrument(available_channel, sfid, bank, preset)
-        self._registry[instrument_name] = {
-            "channel": available_channel,
-            "sfid": sfid,
-            "bank": bank,
-            "preset": preset
-        }
+        # Share the channel of instruments with the same program or select it on a new channel from the pool
+        program = (sfid, bank, preset)
+        with self._lock:
+            previous = self._registry.pop(instrument_name, None)
+            if previous:
+                self._release_channel(previous["channel"])
+            available_channel = self._program_channels.get(program)
+            new_channel = available_channel is None
+            if new_channel:
+                if not self._free_channels:
+                    if previous:
+                        self._registry[instrument_name] = previous
+                    raise RuntimeError(f"No free channel left to register '{instrument_name}'!")
+                available_channel = self._free_channels.popleft()
+                self._program_channels[program] = available_channel
+            self._registry[instrument_name] = {
+                "channel": available_channel,
+                "sfid": sfid,
+                "bank": bank,
+                "preset": preset
+            }
+
+        if new_channel:
+            self._sound_engine.select_instrument(available_channel, sfid, bank, preset)
+
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            channel_info = self._sound_engine.channel_info(available_channel)
+            logging.debug(
+                "Registered '%s' (bank=%s,preset=%s) for channel %s and mapped to '%s'!",
+                channel_info.name, bank, preset, available_channel, instrument_name
+            )
+
+    def unregister_instrument(self, instrument_name):
+        """Unregisters an instrument and returns its channel to the pool.
 
-        channel_info = self._sound_engine.channel_info(available_channel)
-
-        logging.debug(
-            f"Registered '{channel_info.name}' (bank={bank},preset={preset}) "
-            f"for channel {available_channel} and mapped to '{instrument_name}'!"
-        )
+        Args:
+            instrument_name (str): The name of the instrument to unregister.
+        """
+        with self._lock:
+            instrument = self._registry.pop(instrument_name, None)
+            if instrument:
+                self._release_channel(instrument["channel"])
+
+    def _release_channel(self, channel):
+        # Returns the channel to the pool once no instrument uses it anymore (called with the lock held)
+        if any(instrument["channel"] == channel for instrument in self._registry.values()):
+            return
+        for program, program_channel in list(self._program_channels.items()):
+            if program_channel == channel:
+                del self._program_channels[program]
+        # Reuse recently freed channels first
+        self._free_channels.appendleft(channel)
 
     def get_instrument(self, instrument_name):
         """Returns the SoundEngine instance and the instrument's channel.
@@ -0,0 +1,48 @@
+from array import array
+
+class MidiEventRing:
+    """A fixed-size single-producer/single-consumer ring buffer of MIDI events.
+
+    The producer only advances the head and the consumer only advances the tail,
+    so the buffer needs no lock and pushing an event never allocates memory.
+    """
+
+    def __init__(self, capacity=256):
+        """Initialize the ring buffer.
+
+        Args:
+            capacity (int, optional): The number of buffer slots, one of them always stays free. Defaults to 256.
+        """
+        self._capacity = capacity
+        self._events = array('i', [0] * (3 * capacity))  # Flat (status, note, velocity) triplets
+        self._head = 0  # Next slot to write, only changed by the producer
+        self._tail = 0  # Next slot to read, only changed by the consumer
+
+    def push(self, status, note, velocity):
+        """Appends an event, dropping it if the buffer is full.
+
+        Args:
+            status (int): The MIDI status byte (e.g. 0x90 for note on).
+            note (int): The MIDI note value.
+            velocity (int): The note velocity.
+
+        Returns:
+            bool: True if the event was appended.
+        """
+        head = self._head
+        next_head = (head + 1) % self._capacity
+        if next_head == self._tail:
+            return False
+        i = head * 3
+        self._events[i] = status
+        self._events[i + 1] = note
+        self._events[i + 2] = velocity
+        self._head = next_head  # Publish the event after it has been written
+        return True
+
+    def drain(self):
+        """Yields all pending events as (status, note, velocity) tuples, oldest first."""
+        while self._tail != self._head:
+            i = self._tail * 3
+            yield self._events[i], self._events[i + 1], self._events[i + 2]
+            self._tail = (self._tail + 1) % self._capacity
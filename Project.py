@@ -3,7 +3,6 @@ from InstrumentRegistry import InstrumentRegistry
 
 import logging
 import threading
-import time
 
 
 class Project:
@@ -15,9 +14,13 @@ class Project:
         self._bpm = bpm
         self._beats_per_measure = beats_per_measure
         self._seconds_per_beat = 60 / bpm  # Calculate seconds per beat (for the metronome)
-        self._channels = []
+        self._ms_per_beat = round(60_000 / bpm)  # Beat length in integer sequencer ticks
+        self._channel_map = {}  # Channels by id, for constant time removal (keeps the insertion order)
+        self._channels = ()  # Replaced as a whole on changes, so the tick callback never needs a lock
         self._is_playing = False
-        self._lock = threading.Lock()  # For synchronizing the tick steps
+        self._lock = threading.Lock()  # For synchronizing channel changes
+        self._generation = 0  # Incremented on every play, ticks of older plays are ignored
+        self._tick_callback_id = soundengine.register_callback("projectTick", self._tick_callback)
 
     def get_instrument_registry(self):
         """Returns the Instrument Registry."""
@@ -35,34 +38,56 @@ class Project:
         """Returns the seconds per beat based on the BPM."""
         return self._seconds_per_beat
 
+    def get_ms_per_beat(self):
+        """Returns the milliseconds per beat based on the BPM."""
+        return self._ms_per_beat
+
     def add_channel(self, channel):
         """Adds a channel to the project."""
-        self._channels.append(channel)
+        with self._lock:
+            self._channel_map[id(channel)] = channel
+            self._channels = tuple(self._channel_map.values())
 
     def remove_channel(self, channel):
         """Removes a channel from the project."""
-        self._channels.remove(channel)
+        with self._lock:
+            if self._channel_map.pop(id(channel), None) is not None:
+                self._channels = tuple(self._channel_map.values())
 
     def get_channels(self):
         """Returns all channels"""
         return self._channels
 
-    def start_ticking(self):
-        """Starts the beat management and notifies all channels."""
-        self._is_playing = True
-        while self._is_playing:
-            with self._lock:
-                for tick in range(self._beats_per_measure):
-                    # Notify all channels that a tick has occurred
-                    for channel in self._channels:
-                        channel.tick()
-                    time.sleep(self.get_seconds_per_beat())  # Wait until the next beat
+    def _tick_callback(self, time, generation):
+        """Notifies all channels that a tick has occurred and schedules the next tick."""
+        if not self._is_playing or generation != self._generation:
+            return  # Stopped, or a tick of an earlier play whose chain ends here
+
+        # Notify all channels of the current snapshot that a tick has occurred
+        for channel in self._channels:
+            channel.tick()
+
+        self._schedule_tick()
+
+    def _schedule_tick(self):
+        """Schedules the sequencer callback of the next beat."""
+        # Beat times are derived from the beat count, so they never drift
+        beat_tick = self._start_tick + 60_000 * self._beat_count // self._bpm
+        self._beat_count += 1
+        self._soundengine.schedule_callback(beat_tick, self._tick_callback_id, self._generation)
 
     def play(self):
         """Starts the project and all channels."""
         logging.debug("Starting the project.")
-        threading.Thread(target=self.start_ticking).start()
         self._soundengine.start()
+        if not self._is_playing:
+            # Ticks are timed by the sequencer of the sound engine, on the same clock as the notes.
+            # Playing is switched on last, so a stale tick never sees the counters half-reset.
+            self._generation += 1
+            self._beat_count = 0
+            self._start_tick = self._soundengine.get_tick()
+            self._is_playing = True
+            self._schedule_tick()
         for channel in self._channels:
             logging.debug("Starting channel: %s", channel)
             channel.play()
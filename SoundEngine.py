@@ -66,8 +66,31 @@ class SoundEngine(ABC):
         pass
 
     @abstractmethod
-    def update(self):
-        """Loads the notes of the step channels into the sequence."""
+    def get_tick(self):
+        """Returns the current time of the sequencer in milliseconds."""
+        pass
+
+    @abstractmethod
+    def schedule_note(self, time, channel, note, velocity, duration):
+        """Schedules a note to be played on the specified channel at the given time for the given duration."""
+        pass
+
+    @abstractmethod
+    def register_callback(self, name, callback):
+        """Registers a callback for timers of the sequencer.
+
+        Args:
+            name (str): The name of the callback.
+            callback (callable): Called with the time in milliseconds and the data of the timer when a scheduled timer expires.
+
+        Returns:
+            int: The ID of the callback.
+        """
+        pass
+
+    @abstractmethod
+    def schedule_callback(self, time, callback_id, data=0):
+        """Schedules a timer which calls the registered callback with the data (int) at the given time."""
         pass
 
     @abstractmethod
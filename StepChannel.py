@@ -1,31 +1,90 @@
 import logging
 
+import numpy as np
+
+# Display glyphs of the steps, indexed by whether the step is set
+STEP_GLYPHS = np.array([b"o-", b"x-"])
+
+def _check_midi_values(name, values):
+    # MIDI notes and velocities are 7 bit, larger values would not fit into the step arrays
+    values = np.asarray(values)
+    if values.size and not (0 <= values.min() and values.max() <= 127):
+        raise ValueError(f"{name} out of range (0-127): {values.tolist()}")
+
 class StepChannel:
     """Abstract base class for all step channels."""
 
-    def __init__(self, instrument_name, volume=80):
+    def __init__(self, instrument_name, volume=80, steps=32):
         self._instrument_name = instrument_name
         self._volume = volume
         self._is_playing = False
-        self._steps = []
+        self._step_count = steps
+        # Note and velocity of each step in parallel arrays, velocity 0 is a rest
+        self._notes = np.zeros(steps, dtype=np.uint8)
+        self._velocities = np.zeros(steps, dtype=np.uint8)
+        self._mask = 0  # Bitmask of the steps with notes (bit n set = step n has a note)
+        self._row = None  # Display row of the steps (snapshot, row)
+        self._publish()
 
-    def set_step(self, step, note, velocity):
-        # If the step index is greater than the current list, extend the list with None
-        if step >= len(self._steps):
-            # Add the required number of None values to reach the index
-            self._steps.extend([None] * (step + 1 - len(self._steps)))
+    def _publish(self):
+        # Publish an immutable snapshot with a single reference store, so readers on
+        # other threads never see a half-written step
+        self._snapshot = (tuple(self._notes.tolist()), tuple(self._velocities.tolist()), self._mask)
+
+    def _check_step(self, step):
+        # Steps are fixed at construction, negative indices would silently wrap around
+        if not 0 <= step < self._step_count:
+            raise IndexError(f"Step {step} out of range (0-{self._step_count - 1})")
 
+    def set_step(self, step, note, velocity):
         # Set the step with the note and velocity
-        self._steps[step] = [note, velocity]
+        self._check_step(step)
+        _check_midi_values("Note", note)
+        _check_midi_values("Velocity", velocity)
+        self._notes[step] = note
+        self._velocities[step] = velocity
+        if velocity:
+            self._mask |= 1 << step
+        else:
+            self._mask &= ~(1 << step)
+        self._publish()
 
-    def reset_step(self, step):
-        # If the step index is greater than the current list, extend the list with None
-        if step >= len(self._steps):
-            # Add the required number of None values to reach the index
-            self._steps.extend([None] * (step + 1 - len(self._steps)))
+    def set_pattern(self, notes, velocity=127):
+        """Replaces all steps with a pattern, steps after the end of the pattern are rests.
+
+        Args:
+            notes (list): The note of each step from the first step on, None for a rest.
+            velocity (int or list, optional): The velocity of all notes or of each step. Defaults to 127.
+        """
+        if len(notes) > self._step_count:
+            raise IndexError(f"Pattern of {len(notes)} steps exceeds the {self._step_count} steps")
+        length = len(notes)
+        is_set = np.array([note is not None for note in notes], dtype=np.bool_)
+        # Build and check the new steps first, so the channel is left unchanged on an error
+        pattern_notes = np.array([0 if note is None else note for note in notes], dtype=np.int64)
+        pattern_velocities = np.zeros(length, dtype=np.int64)
+        pattern_velocities[:] = velocity
+        pattern_velocities[~is_set] = 0
+        _check_midi_values("Note", pattern_notes)
+        _check_midi_values("Velocity", pattern_velocities)
+        new_notes = np.zeros(self._step_count, dtype=np.uint8)
+        new_notes[:length] = pattern_notes
+        new_velocities = np.zeros(self._step_count, dtype=np.uint8)
+        new_velocities[:length] = pattern_velocities
+        # Bit n of the mask is set if step n has a note
+        mask = int.from_bytes(np.packbits(new_velocities != 0, bitorder="little").tobytes(), "little")
+        self._notes = new_notes
+        self._velocities = new_velocities
+        self._mask = mask
+        self._publish()
 
-        # Reset the step by setting it to None
-        self._steps[step] = None
+    def reset_step(self, step):
+        # Reset the step to a rest
+        self._check_step(step)
+        self._notes[step] = 0
+        self._velocities[step] = 0
+        self._mask &= ~(1 << step)
+        self._publish()
 
     def set_instrument(self, instrument_name):
         """Sets the channel's instrument based on the instrument name."""
@@ -51,5 +110,24 @@ class StepChannel:
             logging.debug(f"Pausing Step Channel {self._instrument_name}...")
             self._is_playing = False
 
+    def get_step_count(self):
+        """Returns the number of steps of the channel."""
+        return self._step_count
+
     def get_steps(self):
-        return self._steps
\ No newline at end of file
+        """Returns the steps as parallel arrays of notes and velocities, velocity 0 is a rest."""
+        return self._notes, self._velocities
+
+    def get_snapshot(self):
+        """Returns an immutable snapshot of the steps as a tuple of notes, velocities and the step bitmask."""
+        return self._snapshot
+
+    def render(self):
+        """Returns the display row of the steps, which is only rebuilt when a new snapshot was published."""
+        snapshot = self._snapshot  # Read the published snapshot once, like the scheduler does
+        if self._row is None or self._row[0] is not snapshot:
+            # Look up the glyphs of all steps at once from the mask of set steps
+            is_set = np.array(snapshot[1], dtype=np.bool_)
+            steps = STEP_GLYPHS[is_set.view(np.uint8)].tobytes().decode("ascii")
+            self._row = (snapshot, f"   [{steps[:-1]}]")
+        return self._row[1]
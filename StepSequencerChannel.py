@@ -10,10 +10,22 @@ class StepSequencerChannel(InstrumentChannel):
         """Returns sequencer"""
         return self._parent.get_soundengine()
 
+    def render(self, label, rows):
+        """Appends the label row and the step rows of all step channels of the sequencer to rows."""
+        rows.append(label)
+        for step_channel in self.get_sequencer().get_channels():
+            rows.append(step_channel.render())
+
     def play(self):
-        """Starts the channel"""
+        """Starts the channel and the sequencer"""
+        was_playing = self._is_playing
         super().play()  # Set the channel to "play"
+        if self._is_playing and not was_playing:
+            self.get_sequencer().start()
 
     def stop(self):
-        """Stops the channel"""
-        super().stop()  # Set the channel to "stop"
\ No newline at end of file
+        """Stops the channel and the sequencer"""
+        was_playing = self._is_playing
+        super().stop()  # Set the channel to "stop"
+        if was_playing and not self._is_playing:
+            self.get_sequencer().stop()
@@ -1,10 +1,8 @@
-import mido
+import rtmidi
 import threading
 import curses
-import time
-import sys
+import signal
 import logging
-import traceback
 
 from FreeMetronomeChannel import FreeMetronomeChannel
 from FreeMidiChannel import FreeMidiChannel
@@ -16,55 +14,62 @@ from StepSequencerChannel import StepSequencerChannel
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-def render_curses(screen, project):
-    """Curses render function for threading"""
+def render_curses(screen, project, done):
+    """Curses render loop, runs on the main thread until done is set"""
+    screen.timeout(33)  # Refresh rate (30 Hz), getch waits up to 33 ms for a key press
+    frame = []  # Rows drawn in the last frame
+    channels = None  # Channels of the last frame, the project replaces the tuple on changes
+    screen_size = screen.getmaxyx()
+    last_error = None  # Message of the last shown error
     try:
-        while True:
-            screen.clear()
-            line = 0
-            for i, channel in enumerate(project.get_channels()):
-                # Show channel name
-                screen.addstr(line, 0, f"Channel {i + 1}: {channel._instrument_name}")
-                if isinstance(channel, StepSequencerChannel):
-                    # Get parent sequencer
-                    sequencer = channel.get_sequencer()
-
-                    # Get children step channels
-                    step_channels = sequencer.get_channels()
-
-                    # Show steps
-                    for step_channel in step_channels:
-                        line=line+1
-                        screen.addstr(line, 3, "[")
-                        for j, step in enumerate(step_channel.get_steps()):
-                            if step is None:
-                                # Show non set steps
-                                screen.addstr(line, j * 2 + 4, "o-")
-                            else:
-                                # Show set steps
-                                note, velocity = step
-                                if note is None or velocity is None:
-                                    screen.addstr(line, j * 2 + 4, "o-")
-                                else:
-                                    screen.addstr(line, j * 2 + 4, "x-")
-                        screen.addstr(line, 67, "]")
-                line=line+1
+        while not done.is_set():
+            if project.get_channels() is not channels:
+                # Build the render plan (render method and name of each channel) only when the channels have changed
+                channels = project.get_channels()
+                render_plan = [(channel.render, f"Channel {i + 1}: {channel._instrument_name}")
+                               for i, channel in enumerate(channels)]
+            if screen.getmaxyx() != screen_size:
+                # Repaint everything after the terminal was resized
+                screen_size = screen.getmaxyx()
+                screen.clear()
+                frame = []
+
+            try:
+                rows = []
+                for render, label in render_plan:
+                    render(label, rows)
+
+                # Only repaint the rows which changed since the last frame, from their first changed column
+                for line, row in enumerate(rows):
+                    last_row = frame[line] if line < len(frame) else ""
+                    if last_row != row:
+                        column = 0
+                        for column, (old, new) in enumerate(zip(last_row, row)):
+                            if old != new:
+                                break
+                        else:
+                            column = min(len(last_row), len(row))
+                        screen.move(line, column)
+                        screen.clrtoeol()
+                        screen.addstr(line, column, row[column:])
+                for line in range(len(rows), len(frame)):
+                    screen.move(line, 0)
+                    screen.clrtoeol()
+                frame = rows
+            except curses.error:
+                raise
+            except Exception as e:
+                # Log and show each new error once, and keep rendering at the normal refresh rate
+                if str(e) != last_error:
+                    last_error = str(e)
+                    logging.exception("Unexpected error happened: %s", e)
+                    screen.addstr(10, 0, f"!!! Unexpected error happened: {e} !!!")
+                    frame = []  # Repaint all rows in the next frame
             screen.refresh()  # Refresh screen
-            time.sleep(0.5)   # Refresh rate
+            if screen.getch() == ord("q"):  # Wait for the next frame, "q" quits
+                done.set()
     except curses.error:
         pass  # Ignore display errors
-    except Exception as e:
-        # Handle all other exceptions
-        logging.error(f"Unexpected error happened: {e}")
-        screen.addstr(10, 0, f"!!! Unexpected error happened: {e} !!!")
-        screen.refresh()
-        time.sleep(10)  
-
-
-def start_curses_thread(project):
-    def curses_thread(screen):
-        render_curses(screen, project)
-    threading.Thread(target=curses.wrapper, args=(curses_thread,), daemon=True).start()
 
 # Create a FluidSynth sound engine instance
 fs_sound_engine = FluidSynthSoundEngine()
@@ -79,29 +84,15 @@ project.get_instrument_registry().register_instrument("Metronome", "sf2/GeneralU
 
 # Create Step Channel
 step_channel_1 = StepChannel("Jazz Guitar")
-step_channel_1.set_step(0, 60, 127)
-step_channel_1.set_step(1, 61, 127)
-step_channel_1.set_step(2, 62, 127)
-step_channel_1.set_step(3, 63, 127)
-step_channel_1.set_step(4, 64, 127)
-step_channel_1.set_step(5, 63, 127)
-step_channel_1.set_step(6, 62, 127)
-step_channel_1.set_step(7, 61, 127)
-step_channel_1.set_step(8, 60, 127)
-step_channel_1.set_step(17, 61, 127)
-step_channel_1.set_step(18, 62, 127)
-step_channel_1.set_step(19, 63, 127)
-step_channel_1.set_step(20, 64, 127)
-step_channel_1.set_step(21, 63, 127)
-step_channel_1.set_step(22, 62, 127)
-step_channel_1.set_step(23, 61, 127)
-step_channel_1.set_step(24, 60, 127)
+step_channel_1.set_pattern([60, 61, 62, 63, 64, 63, 62, 61, 60,
+                           None, None, None, None, None, None, None, None,
+                           61, 62, 63, 64, 63, 62, 61, 60])
 
 # Assign Step Channels
 fs_sound_engine.add_channel(step_channel_1)
 
 # Create Instrument Channels
-for port_name in mido.get_input_names():
+for port_name in rtmidi.MidiIn().get_ports():
     fluid_midi_channel = FreeMidiChannel(project, port_name, "Piano")
     project.add_channel(fluid_midi_channel)
 
@@ -111,14 +102,19 @@ project.add_channel(metronome_channel)
 step_sequencer_channel = StepSequencerChannel(project, "Step Sequencer")
 project.add_channel(step_sequencer_channel)
 
-# Start curses display
-start_curses_thread(project)
-
-# Start the project
+# Start the project, it plays on its own threads
 project.play()
 
-# Stop the project after a while (20 seconds)
-time.sleep(20)
+# Stop the project after a while (20 seconds) or as soon as Ctrl-C or "q" is pressed
+done = threading.Event()
+signal.signal(signal.SIGINT, lambda signum, frame: done.set())
+stop_timer = threading.Timer(20, done.set)
+stop_timer.daemon = True
+stop_timer.start()
+
+# Show the curses display on the main thread
+curses.wrapper(render_curses, project, done)
+done.wait()
 project.stop()
 
 # TODO